@@ -1,11 +1,40 @@
 from fastapi import FastAPI, HTTPException, Query
-import requests
-from pyproj import Transformer
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
+import httpx
+import orjson
+from async_lru import alru_cache
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import csv
+import functools
+import json
+import math
 import os
+import sqlite3
+import time
+from multiprocessing import shared_memory
+from typing import Annotated
 
-app = FastAPI()
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from numba import njit
+
+
+class ORJSONResponse(JSONResponse):
+    """Réponse JSON sérialisée avec orjson (nettement plus rapide que json)."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+def json_object(fields: dict, tail: bytes) -> bytes:
+    """Objet JSON formé des champs de fields suivis du fragment déjà sérialisé tail."""
+    return orjson.dumps(fields)[:-1] + b"," + tail + b"}"
+
+
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,33 +47,192 @@ app.add_middleware(
 # ------------------- Géocodage via Nominatim -------------------
 
 NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
-transformer = Transformer.from_crs("EPSG:4326", "EPSG:3812", always_xy=True)
+
+# Requêtes Nominatim simultanées pour tout le processus, tous endpoints confondus
+# (la politique d'usage de Nominatim demande de rester très modéré)
+NOMINATIM_CONCURRENCY = 2
+
+# Client HTTP partagé (les connexions vers Nominatim restent ouvertes, keep-alive)
+# et sémaphore qui borne les requêtes en vol. Tous deux sont créés au démarrage
+# de l'application, dans sa boucle d'événements, et libérés à son arrêt ;
+# None hors de ce cycle.
+http_client: httpx.AsyncClient | None = None
+nominatim_semaphore: asyncio.Semaphore | None = None
+
+
+# ------------------- Projection Lambert 2008 (EPSG:3812) -------------------
+
+# Conique conforme de Lambert à deux parallèles sur GRS80 (Snyder, USGS PP 1395).
+# ETRS89 et WGS84 sont confondus à l'échelle de la grille : pas de changement de datum.
+_A = 6378137.0
+_E = math.sqrt((2 - 1 / 298.257222101) / 298.257222101)
+_LAT_1 = math.radians(49 + 50 / 60)
+_LAT_2 = math.radians(51 + 10 / 60)
+_LAT_0 = math.radians(50 + 47 / 60 + 52.134 / 3600)
+_LON_0 = math.radians(4 + 21 / 60 + 33.177 / 3600)
+_FE = 649328.0
+_FN = 665262.0
+
+
+def _lcc_m(lat: float) -> float:
+    return math.cos(lat) / math.sqrt(1 - (_E * math.sin(lat)) ** 2)
+
+
+def _lcc_t(lat: float) -> float:
+    e_sin = _E * math.sin(lat)
+    return math.tan(math.pi / 4 - lat / 2) / ((1 - e_sin) / (1 + e_sin)) ** (_E / 2)
+
+
+_N = (math.log(_lcc_m(_LAT_1)) - math.log(_lcc_m(_LAT_2))) / (
+    math.log(_lcc_t(_LAT_1)) - math.log(_lcc_t(_LAT_2))
+)
+_AF = _A * _lcc_m(_LAT_1) / (_N * _lcc_t(_LAT_1) ** _N)
+_RHO_0 = _AF * _lcc_t(_LAT_0) ** _N
+
+# Constantes repliées pour le chemin rapide (entrées en degrés) :
+# rho = _AF * tan(pi/4 - lat/2)^n * ((1 + e sin lat) / (1 - e sin lat))^(e n / 2)
+# theta = n * lon - n * lon_0
+_DEG = math.pi / 180
+_HALF_DEG = math.pi / 360
+_QUARTER_PI = math.pi / 4
+_HALF_EN = _E * _N / 2
+_N_DEG = _N * _DEG
+_N_LON_0 = _N * _LON_0
+
+
+def transform_be(lon: float, lat: float) -> tuple[float, float]:
+    """WGS84 (lon, lat en degrés) -> Belgian Lambert 2008 (x, y en mètres)."""
+    e_sin = _E * math.sin(lat * _DEG)
+    rho = _AF * math.tan(_QUARTER_PI - lat * _HALF_DEG) ** _N * ((1 + e_sin) / (1 - e_sin)) ** _HALF_EN
+    theta = _N_DEG * lon - _N_LON_0
+    return _FE + rho * math.sin(theta), _FN + _RHO_0 - rho * math.cos(theta)
+
+
+def transform_be_array(lon: np.ndarray, lat: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Version vectorisée de transform_be, pour des tableaux de points."""
+    lat = np.asarray(lat, dtype=np.float64)
+    e_sin = _E * np.sin(lat * _DEG)
+    rho = _AF * np.tan(_QUARTER_PI - lat * _HALF_DEG) ** _N * ((1 + e_sin) / (1 - e_sin)) ** _HALF_EN
+    theta = _N_DEG * np.asarray(lon, dtype=np.float64) - _N_LON_0
+    return _FE + rho * np.sin(theta), _FN + _RHO_0 - rho * np.cos(theta)
+
 
 # ------------------- Chargement de la grille -------------------
 
 BASE_DIR = os.path.dirname(__file__)
 CSV_PATH = os.path.join(BASE_DIR, "grid_scores.csv")
 
-CASES: list[dict] = []
+# Cases stockées en colonnes (une ligne par case, même ordre que le CSV)
+IDS = np.empty(0, dtype=np.int32)
+SCORES = np.empty(0, dtype=np.int32)  # -1 = score absent
+CENTER_X = np.empty(0, dtype=np.float64)
+CENTER_Y = np.empty(0, dtype=np.float64)
+SIZES = np.empty(0, dtype=np.float64)
+X_MIN = np.empty(0, dtype=np.float64)
+X_MAX = np.empty(0, dtype=np.float64)
+Y_MIN = np.empty(0, dtype=np.float64)
+Y_MAX = np.empty(0, dtype=np.float64)
+
+# Colonnes optionnelles utilisées pour l'analyse
+OPTIONAL_COLS = (
+    "Score TC total sans TGV 24h %",
+    "Score TC train (SNCB) 24h %",
+    "Score TC MTB 24h %",
+    "Score TC total sans TGV 24h_Classe_10",
+    "Score TC train (SNCB) 24h_Classe_10",
+    "Score TC MTB 24h_Classe_10",
+)
 
-# Commentaires par classe 1–10 (placeholders)
-CLASS10_COMMENTS = {
-    1: "Accessibilité très faible",
-    2: "Accessibilité faible",
-    3: "Inférieure à la moyenne",
-    4: "Légèrement inférieure à la moyenne",
-    5: "Moyenne",
-    6: "Légèrement supérieure à la moyenne",
-    7: "Bonne accessibilité",
-    8: "Très bonne accessibilité",
-    9: "Excellente accessibilité",
-    10: "Accessibilité exceptionnelle",
-}
+# Valeurs de l'analyse, une par case (NaN / -1 = valeur absente).
+# La classe 10 totale est SCORES.
+TOTAL_PCT = np.empty(0, dtype=np.float64)
+TRAIN_PCT = np.empty(0, dtype=np.float64)
+MTB_PCT = np.empty(0, dtype=np.float64)
+TRAIN10 = np.empty(0, dtype=np.int8)
+MTB10 = np.empty(0, dtype=np.int8)
+
+# Index spatial : grille uniforme de seaux carrés (GRID_SIZE mètres de côté).
+# Le seau (ix, iy) a pour clé ix * GRID_NY + iy ; ses cases sont
+# BUCKET_ROWS[BUCKET_STARTS[b]:BUCKET_STARTS[b + 1]] où b est la position de
+# la clé dans BUCKET_KEYS (triée). BUCKET_BOXES[k] = (x_min, y_min, x_max, y_max)
+# de la case BUCKET_ROWS[k] en float32 : les boîtes d'un seau sont contiguës
+# en mémoire.
+GRID_SIZE: float = 0.0
+X0: float = 0.0
+Y0: float = 0.0
+GRID_NY: int = 0
+BUCKET_KEYS = np.empty(0, dtype=np.int64)
+BUCKET_STARTS = np.zeros(1, dtype=np.int64)
+BUCKET_ROWS = np.empty(0, dtype=np.int32)
+BUCKET_BOXES = np.empty((0, 4), dtype=np.float32)
+
+# Commentaires par classe 1–10 (placeholders), indexés par la classe.
+# Le CSV contient aussi des classes 0 : pas de commentaire pour elles.
+COMMENTS_TABLE = (
+    None,
+    "Accessibilité très faible",
+    "Accessibilité faible",
+    "Inférieure à la moyenne",
+    "Légèrement inférieure à la moyenne",
+    "Moyenne",
+    "Légèrement supérieure à la moyenne",
+    "Bonne accessibilité",
+    "Très bonne accessibilité",
+    "Excellente accessibilité",
+    "Accessibilité exceptionnelle",
+)
+
+# Classe lisible indexée par le score sur 10 (0 à 10)
+CLASSIFY_TABLE = (
+    "très faible",
+    "très faible",
+    "très faible",
+    "faible à moyenne",
+    "faible à moyenne",
+    "moyenne à correcte",
+    "moyenne à correcte",
+    "bonne à très bonne",
+    "bonne à très bonne",
+    "excellente",
+    "excellente",
+)
+
+# Plus haute classe couverte par les deux tables ci-dessus
+CLASS10_MAX = 10
+
+
+def _to_float_array(column: pa.ChunkedArray) -> np.ndarray:
+    """Colonne Arrow -> tableau float64, valeurs absentes ou illisibles en NaN."""
+    if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+        return column.to_numpy().astype(np.float64, copy=False)
+
+    # Colonne lue comme texte : au moins une valeur n'est pas un nombre
+    values = np.full(len(column), np.nan)
+    for k, v in enumerate(column.to_pylist()):
+        try:
+            values[k] = float(v.replace(",", "."))
+        except (AttributeError, ValueError):
+            pass
+    return values
+
+
+def _class_array(values: np.ndarray | None, n: int, dtype=np.int8) -> np.ndarray:
+    """
+    Colonne de classes (float64, NaN = absente) -> entiers, -1 = absente.
+
+    Une classe hors de 0 à CLASS10_MAX est traitée comme absente, comme une
+    valeur illisible : les tables de classes ne peuvent pas échouer à la requête.
+    """
+    if values is None:
+        return np.full(n, -1, dtype=dtype)
+    valid = (values >= 0) & (values <= CLASS10_MAX)  # faux pour NaN
+    return np.where(valid, values, -1).astype(dtype)
 
 
 def load_cases():
     """
-    Charge les cases depuis grid_scores.csv (séparateur ;, décimales ,).
+    Charge les cases depuis grid_scores.csv (séparateur ;, décimales ,) avec
+    le lecteur CSV de pyarrow (multi-thread), directement en colonnes.
 
     Colonnes obligatoires :
     - id
@@ -60,215 +248,556 @@ def load_cases():
     - Score TC train (SNCB) 24h_Classe_10
     - Score TC MTB 24h_Classe_10
     """
+    global IDS, SCORES, CENTER_X, CENTER_Y, SIZES, X_MIN, X_MAX, Y_MIN, Y_MAX
+    global TOTAL_PCT, TRAIN_PCT, MTB_PCT, TRAIN10, MTB10
+
     if not os.path.exists(CSV_PATH):
-        raise SystemExit(f"Fichier CSV introuvable : {CSV_PATH}")
+        raise RuntimeError(f"Fichier CSV introuvable : {CSV_PATH}")
 
     with open(CSV_PATH, newline="", encoding="utf-8-sig") as f:
-        reader = csv.DictReader(f, delimiter=';')
-
-        if not reader.fieldnames:
-            raise SystemExit("Impossible de lire les en-têtes du CSV.")
-
-        raw_headers = reader.fieldnames
-        header_map = {h.strip(): h for h in raw_headers}
-
-        required = ["id", "X_LB2008", "Y_LB2008", "ms_len"]
-        missing = [r for r in required if r not in header_map]
-        if missing:
-            raise SystemExit(
-                f"Colonnes manquantes dans grid_scores.csv : {missing}. "
-                f"En-têtes trouvées : {raw_headers}"
-            )
-
-        id_key = header_map["id"]
-        x_key = header_map["X_LB2008"]
-        y_key = header_map["Y_LB2008"]
-        len_key = header_map["ms_len"]
-
-        optional_cols = [
-            "Score TC total sans TGV 24h %",
-            "Score TC train (SNCB) 24h %",
-            "Score TC MTB 24h %",
-            "Score TC total sans TGV 24h_Classe_10",
-            "Score TC train (SNCB) 24h_Classe_10",
-            "Score TC MTB 24h_Classe_10",
-        ]
-
-        for row in reader:
-            try:
-                id_val = int(row[id_key])
-                x_center = float(row[x_key].replace(",", "."))
-                y_center = float(row[y_key].replace(",", "."))
-                size = float(row[len_key].replace(",", "."))
-            except Exception:
-                continue
-
-            extras = {}
-            for col in optional_cols:
-                raw_col_name = header_map.get(col, col)
-                if raw_col_name in row and row[raw_col_name] is not None and row[raw_col_name].strip() != "":
-                    val_str = row[raw_col_name].replace(",", ".")
-                    try:
-                        if col.endswith("_Classe_10"):
-                            extras[col] = int(float(val_str))
-                        else:
-                            # Pourcentiles = garder toute la précision (pas d'arrondi ici)
-                            extras[col] = float(val_str)
-                    except Exception:
-                        extras[col] = None
-                else:
-                    extras[col] = None
-
-            half = size / 2.0
-
-            case = {
-                "id": id_val,
-                # score principal = classe 10 totale (si disponible)
-                "score": extras.get("Score TC total sans TGV 24h_Classe_10"),
-                "x_min": x_center - half,
-                "x_max": x_center + half,
-                "y_min": y_center - half,
-                "y_max": y_center + half,
-                "center_x": x_center,
-                "center_y": y_center,
-                "size": size,
-                "extras": extras,
-            }
-            CASES.append(case)
-
-    if not CASES:
-        raise SystemExit("Aucune case valide trouvée dans grid_scores.csv.")
-
-
-load_cases()
+        raw_headers = next(csv.reader(f, delimiter=";"), [])
+    if not raw_headers:
+        raise RuntimeError("Impossible de lire les en-têtes du CSV.")
+
+    # Position de chaque colonne, résolue une fois depuis la ligne d'en-tête
+    col_idx = {h.strip(): i for i, h in enumerate(raw_headers)}
+
+    required = ["id", "X_LB2008", "Y_LB2008", "ms_len"]
+    missing = [r for r in required if r not in col_idx]
+    if missing:
+        raise RuntimeError(
+            f"Colonnes manquantes dans grid_scores.csv : {missing}. "
+            f"En-têtes trouvées : {raw_headers}"
+        )
+
+    wanted = required + list(OPTIONAL_COLS)
+    positions = sorted({col_idx[c] for c in wanted if c in col_idx})
+
+    table = pa_csv.read_csv(
+        CSV_PATH,
+        parse_options=pa_csv.ParseOptions(delimiter=";"),
+        convert_options=pa_csv.ConvertOptions(
+            decimal_point=",",
+            include_columns=[raw_headers[i] for i in positions],
+        ),
+    )
+    columns = {
+        raw_headers[i].strip(): _to_float_array(table.column(raw_headers[i]))
+        for i in positions
+    }
+
+    # Les lignes sans valeur lisible dans une colonne obligatoire sont ignorées
+    valid = np.ones(table.num_rows, dtype=bool)
+    for col in required:
+        valid &= ~np.isnan(columns[col])
+    if not valid.any():
+        raise RuntimeError("Aucune case valide trouvée dans grid_scores.csv.")
+    columns = {col: values[valid] for col, values in columns.items()}
+    n = int(valid.sum())
+
+    # Pourcentiles = garder toute la précision (pas d'arrondi ici)
+    no_value = np.full(n, np.nan)
+    TOTAL_PCT = columns.get("Score TC total sans TGV 24h %", no_value)
+    TRAIN_PCT = columns.get("Score TC train (SNCB) 24h %", no_value)
+    MTB_PCT = columns.get("Score TC MTB 24h %", no_value)
+    TRAIN10 = _class_array(columns.get("Score TC train (SNCB) 24h_Classe_10"), n)
+    MTB10 = _class_array(columns.get("Score TC MTB 24h_Classe_10"), n)
+
+    IDS = columns["id"].astype(np.int32)
+    # score principal = classe 10 totale (si disponible)
+    SCORES = _class_array(columns.get("Score TC total sans TGV 24h_Classe_10"), n, np.int32)
+    CENTER_X = columns["X_LB2008"]
+    CENTER_Y = columns["Y_LB2008"]
+    SIZES = columns["ms_len"]
+
+    half = SIZES / 2.0
+    X_MIN = CENTER_X - half
+    X_MAX = CENTER_X + half
+    Y_MIN = CENTER_Y - half
+    Y_MAX = CENTER_Y + half
+
+    build_grid_index()
+
+
+def build_grid_index():
+    """
+    Range les cases dans une grille uniforme de seaux de GRID_SIZE mètres.
+
+    Les cases n'ont pas toutes la même taille (ms_len de 125 à 1000 m) et
+    leurs centres ne sont pas alignés sur une grille commune : chaque case est
+    donc enregistrée dans tous les seaux que ses bornes touchent. Un seau
+    contient les numéros de ligne de ses cases dans l'ordre du CSV, si bien
+    que la recherche renvoie la même case qu'un parcours linéaire.
+    """
+    global GRID_SIZE, X0, Y0, GRID_NY, BUCKET_KEYS, BUCKET_STARTS, BUCKET_ROWS, BUCKET_BOXES
+
+    GRID_SIZE = float(SIZES.max())
+    X0 = float(X_MIN.min())
+    Y0 = float(Y_MIN.min())
+
+    ix0 = ((X_MIN - X0) // GRID_SIZE).astype(np.int64)
+    iy0 = ((Y_MIN - Y0) // GRID_SIZE).astype(np.int64)
+    ix1 = ((X_MAX - X0) // GRID_SIZE).astype(np.int64)
+    iy1 = ((Y_MAX - Y0) // GRID_SIZE).astype(np.int64)
+    GRID_NY = int(iy1.max()) + 1
+
+    # Une paire (clé du seau, ligne) par seau touché par chaque case
+    rows = np.arange(len(IDS), dtype=np.int32)
+    keys, members = [], []
+    for dx in range(int((ix1 - ix0).max()) + 1):
+        for dy in range(int((iy1 - iy0).max()) + 1):
+            sel = (ix0 + dx <= ix1) & (iy0 + dy <= iy1)
+            keys.append((ix0[sel] + dx) * GRID_NY + iy0[sel] + dy)
+            members.append(rows[sel])
+    keys = np.concatenate(keys)
+    members = np.concatenate(members)
+
+    # Tri par seau puis par ligne : chaque seau devient une tranche contiguë
+    order = np.lexsort((members, keys))
+    keys = keys[order]
+    BUCKET_ROWS = members[order]
+    BUCKET_KEYS, starts = np.unique(keys, return_index=True)
+    BUCKET_STARTS = np.append(starts, len(keys)).astype(np.int64)
+
+    # En float32, le pas est de 6 cm à 800 km : les boîtes servent de pré-filtre,
+    # pour moitié moins de mémoire à parcourir. Elles sont élargies d'un ULP vers
+    # l'extérieur pour ne perdre aucun point à l'arrondi ; chaque candidat est
+    # ensuite confirmé sur les bornes exactes (float64) de la case.
+    lo = np.column_stack([X_MIN, Y_MIN]).astype(np.float32)
+    hi = np.column_stack([X_MAX, Y_MAX]).astype(np.float32)
+    boxes = np.hstack([
+        np.nextafter(lo, np.float32(-np.inf)),
+        np.nextafter(hi, np.float32(np.inf)),
+    ])
+    BUCKET_BOXES = boxes[BUCKET_ROWS]
+
+
+@njit(cache=True)
+def _find_case_idx(x, y, x0, y0, grid_size, grid_ny, keys, starts, rows, boxes,
+                   x_min, x_max, y_min, y_max):
+    """Numéro de ligne de la case contenant (x, y), ou -1 (code natif numba)."""
+    ix = int((x - x0) // grid_size)
+    iy = int((y - y0) // grid_size)
+    if ix < 0 or iy < 0 or iy >= grid_ny:
+        return -1
+
+    key = ix * grid_ny + iy
+    b = np.searchsorted(keys, key)
+    if b == keys.size or keys[b] != key:
+        return -1
+
+    xf = np.float32(x)
+    yf = np.float32(y)
+    for k in range(starts[b], starts[b + 1]):
+        if boxes[k, 0] <= xf < boxes[k, 2] and boxes[k, 1] <= yf < boxes[k, 3]:
+            i = rows[k]
+            if x_min[i] <= x < x_max[i] and y_min[i] <= y < y_max[i]:
+                return i
+    return -1
+
+
+def find_case_for_point(x, y) -> int | None:
+    """Renvoie le numéro de ligne de la case contenant (x, y), ou None."""
+    i = _find_case_idx(
+        float(x), float(y), X0, Y0, GRID_SIZE, GRID_NY,
+        BUCKET_KEYS, BUCKET_STARTS, BUCKET_ROWS, BUCKET_BOXES,
+        X_MIN, X_MAX, Y_MIN, Y_MAX,
+    )
+    return None if i < 0 else int(i)
+
+
+@njit(cache=True)
+def _find_cases_idx(xs, ys, x0, y0, grid_size, grid_ny, keys, starts, rows, boxes,
+                    x_min, x_max, y_min, y_max):
+    out = np.empty(xs.size, dtype=np.int32)
+    for j in range(xs.size):
+        out[j] = _find_case_idx(
+            xs[j], ys[j], x0, y0, grid_size, grid_ny, keys, starts, rows, boxes,
+            x_min, x_max, y_min, y_max,
+        )
+    return out
+
+
+def find_cases_for_points(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    """Numéros de ligne des cases contenant chaque point (-1 hors grille)."""
+    return _find_cases_idx(
+        np.asarray(xs, dtype=np.float64), np.asarray(ys, dtype=np.float64),
+        X0, Y0, GRID_SIZE, GRID_NY,
+        BUCKET_KEYS, BUCKET_STARTS, BUCKET_ROWS, BUCKET_BOXES,
+        X_MIN, X_MAX, Y_MIN, Y_MAX,
+    )
+
+
+# ------------------- Partage de la grille entre workers -------------------
+
+# Variable d'environnement décrivant la grille publiée en mémoire partagée
+GRID_SHM_ENV = "ACCESSTC_GRID_SHM"
+
+# Tableaux publiés en mémoire partagée, et scalaires de l'index qui les accompagnent
+SHARED_ARRAYS = (
+    "IDS", "SCORES", "CENTER_X", "CENTER_Y", "SIZES",
+    "X_MIN", "X_MAX", "Y_MIN", "Y_MAX",
+    "TOTAL_PCT", "TRAIN_PCT", "MTB_PCT", "TRAIN10", "MTB10",
+    "BUCKET_KEYS", "BUCKET_STARTS", "BUCKET_ROWS", "BUCKET_BOXES",
+)
+SHARED_SCALARS = ("GRID_SIZE", "X0", "Y0", "GRID_NY")
+
+# Segments ouverts par ce processus (gardés pour que les vues restent valides)
+_shm_segments: list[shared_memory.SharedMemory] = []
+
+
+def share_grid() -> list[shared_memory.SharedMemory]:
+    """
+    Copie la grille chargée en mémoire partagée et la décrit dans GRID_SHM_ENV.
+
+    Les workers lancés ensuite (qui héritent de l'environnement) s'y attachent
+    au lieu de relire le CSV : une seule copie de la grille pour tous. Les
+    segments créés doivent être libérés (close + unlink) par l'appelant.
+    """
+    layout = {}
+    for name in SHARED_ARRAYS:
+        arr = globals()[name]
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        _shm_segments.append(shm)
+        layout[name] = [shm.name, arr.dtype.str, list(arr.shape)]
+
+    os.environ[GRID_SHM_ENV] = json.dumps({
+        "arrays": layout,
+        "scalars": {name: globals()[name] for name in SHARED_SCALARS},
+    })
+    return list(_shm_segments)
+
+
+def attach_shared_grid(spec: str):
+    """Remplace les tableaux de la grille par des vues sur la mémoire partagée."""
+    layout = json.loads(spec)
+    for name, (shm_name, dtype, shape) in layout["arrays"].items():
+        # Les workers lancés par uvicorn partagent le resource_tracker du
+        # processus qui a créé les segments : c'est lui seul qui les supprime.
+        shm = shared_memory.SharedMemory(name=shm_name)
+        _shm_segments.append(shm)
+
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        arr.flags.writeable = False
+        globals()[name] = arr
+    globals().update(layout["scalars"])
+
+
+def load_grid():
+    spec = os.environ.get(GRID_SHM_ENV)
+    if spec:
+        attach_shared_grid(spec)
+    else:
+        load_cases()
+
+    # Compile (ou recharge depuis __pycache__) les noyaux avant la première
+    # requête, pour les tableaux tels qu'ils sont dans ce processus (les vues
+    # en mémoire partagée, en lecture seule, ont leur propre version compilée)
+    find_case_for_point(X0, Y0)
+    find_cases_for_points(np.array([X0]), np.array([Y0]))
+
+
+@functools.lru_cache(maxsize=None)
+def _load():
+    """Charge la grille une seule fois par processus (les appels suivants ne font rien)."""
+    load_grid()
+
+
+@app.on_event("startup")
+async def load_grid_on_startup():
+    # Lecture du CSV et compilation hors de la boucle d'événements ; une
+    # RuntimeError fait échouer le démarrage et arrête proprement le worker.
+    await asyncio.to_thread(_load)
+
 
 # ------------------- Utilitaires -------------------
 
 
 @app.get("/ping")
 def ping():
-    return {"ok": True, "nb_cases": len(CASES)}
-
-
-def geocode_belgium(address: str):
-    r = requests.get(
-        NOMINATIM_URL,
-        params={
-            "q": address,
-            "format": "json",
-            "addressdetails": 1,
-            "countrycodes": "be",
-            "limit": 1,
-        },
-        headers={"User-Agent": "AccessTC-app/1.0"},
-        timeout=10
-    )
+    return {"ok": True, "nb_cases": len(IDS)}
+
+
+# Cache des géocodages : mémoire (LRU) puis SQLite, conservé entre redémarrages.
+# Le fichier peut être placé ailleurs via ACCESSTC_GEOCODE_CACHE ; une entrée
+# plus vieille que GEOCODE_CACHE_TTL est redemandée à Nominatim.
+GEOCODE_CACHE_PATH = os.environ.get(
+    "ACCESSTC_GEOCODE_CACHE", os.path.join(BASE_DIR, "geocode_cache.sqlite3")
+)
+GEOCODE_CACHE_TTL = 30 * 24 * 3600
+
+# Connexion ouverte au démarrage ; None = pas de cache disque
+_geocode_db: sqlite3.Connection | None = None
+
+
+def open_geocode_cache():
+    """
+    Ouvre (et crée si besoin) le cache SQLite des géocodages.
+
+    Si le fichier ne peut pas être ouvert (dossier en lecture seule...),
+    l'API tourne sans cache disque, avec le seul cache mémoire.
+    """
+    global _geocode_db
+    if _geocode_db is not None:
+        return
+
+    try:
+        db = sqlite3.connect(GEOCODE_CACHE_PATH, check_same_thread=False)
+    except sqlite3.Error:
+        return
+    try:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS geocode "
+            "(addr TEXT PRIMARY KEY, lon REAL, lat REAL, ts INTEGER)"
+        )
+    except sqlite3.Error:
+        db.close()
+        return
+    _geocode_db = db
+
+
+@app.on_event("startup")
+async def open_geocode_cache_on_startup():
+    await asyncio.to_thread(open_geocode_cache)
+
+
+@app.on_event("shutdown")
+def close_geocode_cache():
+    global _geocode_db
+    if _geocode_db is not None:
+        _geocode_db.close()
+        _geocode_db = None
+
+
+@app.on_event("startup")
+async def open_http_client():
+    global http_client, nominatim_semaphore
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            timeout=10,
+            headers={"User-Agent": "AccessTC-app/1.0"},
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+    if nominatim_semaphore is None:
+        nominatim_semaphore = asyncio.Semaphore(NOMINATIM_CONCURRENCY)
+
+
+@app.on_event("shutdown")
+async def close_http_client():
+    global http_client, nominatim_semaphore
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+    nominatim_semaphore = None
+
+
+def normalize_address(address: str) -> str:
+    return " ".join(address.lower().split())
+
+
+async def geocode_belgium(address: str):
+    return await _geocode_normalized(normalize_address(address))
+
+
+@alru_cache(maxsize=10000, ttl=GEOCODE_CACHE_TTL)
+async def _geocode_normalized(key: str):
+    """
+    Géocode une adresse déjà normalisée.
+
+    Seules les adresses trouvées sont mises en cache : une adresse introuvable
+    lève HTTPException et sera redemandée à Nominatim la fois suivante. Les
+    deux niveaux de cache (mémoire et SQLite) expirent après GEOCODE_CACHE_TTL.
+    """
+    if _geocode_db is not None:
+        row = _geocode_db.execute(
+            "SELECT lon, lat FROM geocode WHERE addr = ? AND ts >= ?",
+            (key, int(time.time()) - GEOCODE_CACHE_TTL),
+        ).fetchone()
+        if row is not None:
+            return row
+
+    async with nominatim_semaphore:
+        r = await http_client.get(
+            NOMINATIM_URL,
+            params={
+                "q": key,
+                "format": "json",
+                "addressdetails": 1,
+                "countrycodes": "be",
+                "limit": 1,
+            },
+        )
     data = r.json()
 
     if not data:
         raise HTTPException(404, "Adresse introuvable")
 
-    return float(data[0]["lon"]), float(data[0]["lat"])
+    lon, lat = float(data[0]["lon"]), float(data[0]["lat"])
 
+    if _geocode_db is not None:
+        try:
+            with _geocode_db:
+                _geocode_db.execute(
+                    "INSERT OR REPLACE INTO geocode (addr, lon, lat, ts) VALUES (?, ?, ?, ?)",
+                    (key, lon, lat, int(time.time())),
+                )
+        except sqlite3.Error:
+            # Cache disque non inscriptible : le résultat reste valable
+            pass
 
-def find_case_for_point(x, y):
-    for c in CASES:
-        if (c["x_min"] <= x < c["x_max"]) and (c["y_min"] <= y < c["y_max"]):
-            return c
-    return None
+    return lon, lat
+
+
+def build_case(i: int) -> dict:
+    score = int(SCORES[i])
+    return {
+        "id": int(IDS[i]),
+        "score": None if score < 0 else score,
+        "x_min": float(X_MIN[i]),
+        "x_max": float(X_MAX[i]),
+        "y_min": float(Y_MIN[i]),
+        "y_max": float(Y_MAX[i]),
+        "center_x": float(CENTER_X[i]),
+        "center_y": float(CENTER_Y[i]),
+        "size": float(SIZES[i]),
+    }
 
 
 def classify(score10: int | None):
     """
     Classe lisible basée sur le score sur 10 (total).
-    Tu peux ajuster plus tard la logique.
+    Tu peux ajuster plus tard la logique dans CLASSIFY_TABLE.
     """
-    if score10 is None:
-        return None
-    if score10 <= 2:
-        return "très faible"
-    if score10 <= 4:
-        return "faible à moyenne"
-    if score10 <= 6:
-        return "moyenne à correcte"
-    if score10 <= 8:
-        return "bonne à très bonne"
-    return "excellente"
-
-
-def build_accessibility_analysis(case: dict) -> dict:
-    e = case["extras"]
-
-    total_pct = e.get("Score TC total sans TGV 24h %")
-    train_pct = e.get("Score TC train (SNCB) 24h %")
-    mtb_pct = e.get("Score TC MTB 24h %")
-
-    total10 = e.get("Score TC total sans TGV 24h_Classe_10")
-    train10 = e.get("Score TC train (SNCB) 24h_Classe_10")
-    mtb10 = e.get("Score TC MTB 24h_Classe_10")
+    return None if score10 is None else CLASSIFY_TABLE[score10]
+
+
+def comment10(score10: int | None):
+    return None if score10 is None else COMMENTS_TABLE[score10]
+
+
+def _percentile(v: float) -> float | None:
+    return None if v != v else v
+
+
+def _score10(v: int) -> int | None:
+    return None if v < 0 else v
+
+
+def build_accessibility_analysis(i: int) -> dict:
+    total_pct = _percentile(float(TOTAL_PCT[i]))
+    train_pct = _percentile(float(TRAIN_PCT[i]))
+    mtb_pct = _percentile(float(MTB_PCT[i]))
+
+    total10 = _score10(int(SCORES[i]))
+    train10 = _score10(int(TRAIN10[i]))
+    mtb10 = _score10(int(MTB10[i]))
 
     analysis = {
         "total": {
             "percentile": total_pct,
             "score10": total10,
-            "score10_comment": CLASS10_COMMENTS.get(total10, None)
+            "score10_comment": comment10(total10)
         },
         "train": {
             "percentile": train_pct,
             "score10": train10,
-            "score10_comment": CLASS10_COMMENTS.get(train10, None)
+            "score10_comment": comment10(train10)
         },
         "mtb": {
             "percentile": mtb_pct,
             "score10": mtb10,
-            "score10_comment": CLASS10_COMMENTS.get(mtb10, None)
+            "score10_comment": comment10(mtb10)
         }
     }
 
     return analysis
 
 
-# ------------------- Endpoints -------------------
+# Nombre de cases dont la réponse reste prête en mémoire
+CASE_RESPONSE_CACHE_SIZE = 16384
 
 
-@app.get("/score_by_address")
-def score_by_address(address: str = Query(..., min_length=4)):
-    lon, lat = geocode_belgium(address)
-    x, y = transformer.transform(lon, lat)
-
-    case = find_case_for_point(x, y)
-    if case is None:
-        raise HTTPException(404, "Adresse hors de la zone de la grille")
+@functools.lru_cache(maxsize=CASE_RESPONSE_CACHE_SIZE)
+def case_response(i: int) -> bytes:
+    """
+    Champs « case » et « accessibility_analysis » de la réponse pour la case i,
+    déjà sérialisés en JSON (fragment sans accolades).
 
+    Ils ne dépendent que de la case : ils sont sérialisés une fois puis
+    recollés tels quels dans la réponse de toutes les adresses qui y tombent.
+    """
+    case = build_case(i)
     score10 = case["score"]
-    analysis = build_accessibility_analysis(case)
 
-    return {
-        "address_input": address,
-        "geocoding": {"lon": lon, "lat": lat},
-        "lambert2008": {"x": x, "y": y},
-        "case": {
-            "id": case["id"],
-            "score10": score10,
-            "classe": classify(score10),
-            "center_lambert2008": {
-                "x_center": case["center_x"],
-                "y_center": case["center_y"],
-            },
-            "bounds_lambert2008": {
-                "x_min": case["x_min"],
-                "x_max": case["x_max"],
-                "y_min": case["y_min"],
-                "y_max": case["y_max"],
-            },
-            "size_meters": case["size"],
+    payload = {
+        "id": case["id"],
+        "score10": score10,
+        "classe": classify(score10),
+        "center_lambert2008": {
+            "x_center": case["center_x"],
+            "y_center": case["center_y"],
+        },
+        "bounds_lambert2008": {
+            "x_min": case["x_min"],
+            "x_max": case["x_max"],
+            "y_min": case["y_min"],
+            "y_max": case["y_max"],
         },
-        "accessibility_analysis": analysis,
+        "size_meters": case["size"],
     }
 
+    return orjson.dumps({
+        "case": payload,
+        "accessibility_analysis": build_accessibility_analysis(i),
+    })[1:-1]
+
+
+# Résultats complets par adresse normalisée, gardés 24 h
+SCORE_CACHE_SIZE = 50000
+SCORE_CACHE_TTL = 24 * 3600
+
+
+@alru_cache(maxsize=SCORE_CACHE_SIZE, ttl=SCORE_CACHE_TTL)
+async def _score_cached(key: str) -> bytes:
+    """
+    Géocodage, projection et recherche de la case pour une adresse normalisée.
+
+    Renvoie, en fragment JSON, la partie de la réponse qui ne dépend que de
+    l'adresse (depuis « geocoding » jusqu'à la fin) ; une même
+    adresse retombe toujours dans la même case. Les erreurs (adresse
+    introuvable, hors grille) ne sont pas mises en cache.
+    """
+    lon, lat = await _geocode_normalized(key)
+    x, y = transform_be(lon, lat)
+
+    i = find_case_for_point(x, y)
+    if i is None:
+        raise HTTPException(404, "Adresse hors de la zone de la grille")
+
+    fields = orjson.dumps({
+        "geocoding": {"lon": lon, "lat": lat},
+        "lambert2008": {"x": x, "y": y},
+    })
+    return fields[1:-1] + b"," + case_response(i)
+
+
+# ------------------- Endpoints -------------------
+
+
+@app.get("/score_by_address")
+async def score_by_address(address: str = Query(..., min_length=4)):
+    result = await _score_cached(normalize_address(address))
+
+    return Response(
+        json_object({"address_input": address}, result),
+        media_type="application/json",
+    )
+
 
 @app.get("/score_structured")
-def score_structured(
+async def score_structured(
     street: str = Query(..., min_length=2, description="Rue, avenue, ..."),
     number: str = Query(..., min_length=1, description="Numéro de maison"),
     postal_code: str = Query(..., min_length=4, max_length=4, description="Code postal à 4 chiffres"),
@@ -279,17 +808,9 @@ def score_structured(
     else:
         full_address = f"{street} {number}, {postal_code}, Belgique"
 
-    lon, lat = geocode_belgium(full_address)
-    x, y = transformer.transform(lon, lat)
+    result = await _score_cached(normalize_address(full_address))
 
-    case = find_case_for_point(x, y)
-    if case is None:
-        raise HTTPException(404, "Adresse hors de la zone de la grille")
-
-    score10 = case["score"]
-    analysis = build_accessibility_analysis(case)
-
-    return {
+    fields = {
         "address_input_structured": {
             "street": street,
             "number": number,
@@ -297,23 +818,96 @@ def score_structured(
             "city": city,
         },
         "address_built_for_geocoding": full_address,
-        "geocoding": {"lon": lon, "lat": lat},
-        "lambert2008": {"x": x, "y": y},
-        "case": {
-            "id": case["id"],
-            "score10": score10,
-            "classe": classify(score10),
-            "center_lambert2008": {
-                "x_center": case["center_x"],
-                "y_center": case["center_y"],
-            },
-            "bounds_lambert2008": {
-                "x_min": case["x_min"],
-                "x_max": case["x_max"],
-                "y_min": case["y_min"],
-                "y_max": case["y_max"],
-            },
-            "size_meters": case["size"],
-        },
-        "accessibility_analysis": analysis,
     }
+
+    return Response(json_object(fields, result), media_type="application/json")
+
+
+# Taille maximale d'un lot
+BATCH_MAX_ADDRESSES = 100
+
+
+class AddressBatch(BaseModel):
+    # Même contrainte par adresse que pour /score_by_address
+    addresses: list[Annotated[str, Field(min_length=4)]] = Field(
+        ..., min_length=1, max_length=BATCH_MAX_ADDRESSES
+    )
+
+
+@app.post("/score_batch")
+async def score_batch(req: AddressBatch):
+    async def geocode_one(address: str):
+        # Une adresse en échec n'empêche pas de renvoyer les résultats des autres
+        try:
+            return await geocode_belgium(address), None
+        except HTTPException as exc:
+            return None, exc.detail
+        except httpx.HTTPError:
+            return None, "Service de géocodage indisponible"
+        except (ValueError, KeyError, IndexError, TypeError):
+            return None, "Réponse de géocodage invalide"
+
+    geocoded = await asyncio.gather(*(geocode_one(a) for a in req.addresses))
+
+    # Projection et recherche des cases en une passe pour toutes les adresses trouvées
+    found = [k for k, (lonlat, _) in enumerate(geocoded) if lonlat is not None]
+    lons = np.array([geocoded[k][0][0] for k in found], dtype=np.float64)
+    lats = np.array([geocoded[k][0][1] for k in found], dtype=np.float64)
+    xs, ys = transform_be_array(lons, lats)
+    rows = find_cases_for_points(xs, ys)
+
+    results = [
+        orjson.dumps({"address_input": address, "error": error})
+        for address, (_, error) in zip(req.addresses, geocoded)
+    ]
+    for k, lon, lat, x, y, i in zip(
+        found, lons.tolist(), lats.tolist(), xs.tolist(), ys.tolist(), rows.tolist()
+    ):
+        address = req.addresses[k]
+        if i < 0:
+            results[k] = orjson.dumps({
+                "address_input": address,
+                "error": "Adresse hors de la zone de la grille",
+            })
+            continue
+        fields = {
+            "address_input": address,
+            "geocoding": {"lon": lon, "lat": lat},
+            "lambert2008": {"x": x, "y": y},
+        }
+        results[k] = json_object(fields, case_response(i))
+
+    return Response(
+        b'{"results":[' + b",".join(results) + b"]}",
+        media_type="application/json",
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="API AccessTC (grille partagée entre workers)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    _load()
+    segments = share_grid()
+    try:
+        # Boucle uvloop et parseur httptools (fournis par uvicorn[standard]) ;
+        # uvloop n'existant pas sous Windows, on y retombe sur asyncio.
+        uvicorn.run(
+            "main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            loop="auto",
+            http="httptools",
+        )
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()